@@ -3,7 +3,8 @@
 track_applications.py
 Manual-run Gmail job-application tracker -> CSV
 Requirements:
-  pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib beautifulsoup4 python-dateutil
+  pip install google-api-python-client google-auth-httplib2 google-auth-oauthlib beautifulsoup4 lxml python-dateutil
+  optional: pip install orjson  (faster parsing of Gmail API responses)
 Put credentials.json (OAuth client) in same folder. token.json will be created on first run.
 """
 
@@ -14,29 +15,77 @@ import os
 import base64
 import csv
 import argparse
+import contextlib
+import functools
+import io
+import json
 import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.utils import parseaddr, parsedate_to_datetime
+from html import unescape
 from dateutil import tz
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 DEFAULT_CSV = "applications.csv"
+# bs4 fallback only builds these containers (and their contents), skipping <head> styles/tracking blobs
+TEXT_STRAINER = SoupStrainer(["body", "p", "div", "span", "td", "li", "a", "h1", "h2", "h3"])
+BATCH_SIZE = 100  # Gmail batch endpoint accepts at most 100 calls per request
+DEFAULT_CONCURRENCY = 20
+MAX_RETRIES = 5
+# Gmail usually reports rate limiting as 403 with one of these reasons rather than 429
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+PARSE_WORKERS = 8
+METADATA_HEADERS = ["Subject", "From", "Date"]
+# Partial responses: only the fields we read are sent back (no labelIds, historyId, sizeEstimate, ...)
+LIST_FIELDS = "messages/id,nextPageToken"
+MESSAGE_FIELDS = "id,threadId,snippet,payload/headers,payload/mimeType,payload/body,payload/parts"
+CSV_HEADERS = ["message_id","thread_id","date","sender_name","sender_email","subject","company_guess","job_title_guess","status","preview"]
 
-# Heuristic status patterns (lowercase)
+# Heuristic status patterns, matched with re.IGNORECASE (the text is never lower()ed)
 STATUS_PATTERNS = {
     "Offer": [r"\boffer\b", r"congratulations.*offer", r"\boffer letter\b"],
     "Interview": [r"\binterview\b", r"\bschedule.*interview\b", r"\bphone screen\b", r"\btechnical interview\b"],
     "Rejected": [r"\bnot selected\b", r"\bwe regret\b", r"\bunfortunately\b", r"\brejected\b"],
     "Submitted": [r"\bapplication received\b", r"\bthank you for applying\b", r"\bapplication submitted\b"],
-    "Assessment": [r"\bassess(ment|ment link)\b", r"\bcode challenge\b", r"\bonline test\b"],
+    "Assessment": [r"\bassess(?:ment|ment link)\b", r"\bcode challenge\b", r"\bonline test\b"],
+}
+# One alternation per status so the text is scanned once per status, not once per pattern.
+# Dict order is the precedence order: the first status that matches wins.
+STATUS_RE = {
+    status: re.compile("|".join(patterns), re.IGNORECASE)
+    for status, patterns in STATUS_PATTERNS.items()
 }
+TOP_STATUS = next(iter(STATUS_PATTERNS))  # nothing can outrank it, so finding it ends the search
+SENDER_PREFIX_RE = re.compile(r'^(mail|no-reply|noreply|jobs|careers)\.')
+TITLE_APPLICATION_RE = re.compile(r"(application for|applied for|applied to|your application[:\-]\s*)(.+)", re.I)
+TITLE_FIELD_RE = re.compile(r"(position|role|title)[:\-]\s*(.+)", re.I)
+# Line breaks/tabs -> spaces in the one-line preview column
+PREVIEW_TABLE = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+# Small HTML parts (typical auto-replies) are stripped with a regex instead of a parser.
+SMALL_HTML_BYTES = 4096
+TAG_RE = re.compile(r"<(script|style|head)\b.*?</\1\s*>|<!--.*?-->|<[^>]+>", re.I | re.S)
 
-def get_gmail_service():
+def get_credentials():
     creds = None
     if os.path.exists("token.json"):
         creds = Credentials.from_authorized_user_file("token.json", SCOPES)
@@ -50,11 +99,31 @@ def get_gmail_service():
             creds = flow.run_local_server(port=0)
         with open("token.json", "w") as token:
             token.write(creds.to_json())
-    return build("gmail", "v1", credentials=creds)
+    return creds
+
+class OrjsonModel(JsonModel):
+    """
+    JsonModel that decodes API responses with orjson; full messages are large JSON blobs.
+    """
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return super().deserialize(content)
+        if self._data_wrapper and isinstance(body, dict) and "data" in body:
+            body = body["data"]
+        return body
+
+def build_gmail_service(creds):
+    model = OrjsonModel() if orjson is not None else None
+    return build("gmail", "v1", credentials=creds, model=model)
+
+def get_gmail_service():
+    return build_gmail_service(get_credentials())
 
 def search_message_ids(service, query, max_results=500):
     ids = []
-    req = service.users().messages().list(userId="me", q=query, maxResults=500)
+    req = service.users().messages().list(userId="me", q=query, maxResults=500, fields=LIST_FIELDS)
     while req:
         res = req.execute()
         msgs = res.get("messages", [])
@@ -63,55 +132,197 @@ def search_message_ids(service, query, max_results=500):
         ids.extend([m["id"] for m in msgs])
         page_token = res.get("nextPageToken")
         if page_token:
-            req = service.users().messages().list(userId="me", q=query, pageToken=page_token, maxResults=500)
+            req = service.users().messages().list(userId="me", q=query, pageToken=page_token, maxResults=500, fields=LIST_FIELDS)
         else:
             break
         if len(ids) >= max_results:
             break
     return ids[:max_results]
 
-def get_message(service, msg_id):
-    return service.users().messages().get(userId="me", id=msg_id, format="full").execute()
+def message_request(service, msg_id, fmt="full"):
+    # "metadata" returns only the headers we use plus the snippet, a fraction of a full MIME payload
+    extra = {"metadataHeaders": METADATA_HEADERS} if fmt == "metadata" else {}
+    return service.users().messages().get(userId="me", id=msg_id, format=fmt, fields=MESSAGE_FIELDS, **extra)
+
+def get_message(service, msg_id, fmt="full"):
+    # the client backs off and retries rate limits, 5xx and transport errors itself
+    return message_request(service, msg_id, fmt).execute(num_retries=MAX_RETRIES)
+
+def is_retryable(exc):
+    """
+    True for batch failures worth handing to the concurrent fallback:
+    rate limits, 5xx and transport errors.
+    """
+    if not isinstance(exc, HttpError):
+        # timeouts, connection resets, ...
+        return True
+    status = exc.resp.status
+    if status == 429 or status >= 500:
+        return True
+    if status == 403:
+        try:
+            errors = json.loads(exc.content)["error"].get("errors", [])
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return False
+        return any(isinstance(err, dict) and err.get("reason") in RATE_LIMIT_REASONS for err in errors)
+    return False
+
+def fetch_messages_batch(service, msg_ids, fmt="full"):
+    """
+    Fetch up to BATCH_SIZE messages in a single batched HTTP request.
+    Returns ({msg_id: raw}, retry_ids). Retryable failures go to retry_ids;
+    permanent ones (e.g. 404 on a deleted message) are reported here and dropped.
+    """
+    results = {}
+    retry_ids = []
+
+    def on_response(request_id, response, exception):
+        # one failed call must not abort the rest of the batch
+        if exception is None:
+            results[request_id] = response
+        elif is_retryable(exception):
+            retry_ids.append(request_id)
+        else:
+            print(f"Error fetching message {request_id}: {exception}")
+
+    batch = service.new_batch_http_request(callback=on_response)
+    for mid in msg_ids:
+        batch.add(message_request(service, mid, fmt), request_id=mid)
+    batch.execute()
+    return results, retry_ids
+
+def fetch_messages_concurrent(creds, msg_ids, fmt="full", concurrency=DEFAULT_CONCURRENCY):
+    """
+    Fallback for ids the batch request could not return: fetch them one call
+    per id, with up to `concurrency` calls in flight.
+    The client's http object is not thread-safe, so each worker builds its own service.
+    Returns {msg_id: raw}; ids that still fail are reported and left out.
+    """
+    local = threading.local()
+
+    def fetch(mid):
+        if not hasattr(local, "service"):
+            local.service = build_gmail_service(creds)
+        return get_message(local.service, mid, fmt)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(fetch, mid): mid for mid in msg_ids}
+        for fut in as_completed(futures):
+            mid = futures[fut]
+            try:
+                results[mid] = fut.result()
+            except Exception as e:
+                print(f"Error fetching message {mid}: {e}")
+    return results
+
+def fetch_messages(service, creds, msg_ids, fmt="full", concurrency=DEFAULT_CONCURRENCY):
+    """
+    Fetch a chunk of messages with one batch request, then retry the calls that
+    failed transiently (or everything, if the batch itself failed) concurrently.
+    """
+    try:
+        results, retry_ids = fetch_messages_batch(service, msg_ids, fmt)
+    except Exception as e:
+        print(f"Batch request failed ({e}); falling back to concurrent fetch.")
+        results, retry_ids = {}, list(msg_ids)
+    if retry_ids:
+        results.update(fetch_messages_concurrent(creds, retry_ids, fmt, concurrency))
+    return results
+
+class HTMLTextCollector(object):
+    """
+    lxml parser target that keeps only the visible character data of an HTML document,
+    one text run per line (like BeautifulSoup's get_text(separator="\n")), without building a tree.
+    """
+    SKIP_TAGS = {"script", "style", "noscript", "head"}
+
+    def __init__(self):
+        self._buf = io.StringIO()
+        self._run = []
+        self._skip_depth = 0
+
+    def _end_run(self):
+        # tag boundary: emit the text seen since the last one, separated only from earlier text
+        text = "".join(self._run).strip()
+        self._run = []
+        if text:
+            if self._buf.tell():
+                self._buf.write("\n")
+            self._buf.write(text)
+
+    def start(self, tag, attrib):
+        self._end_run()
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag):
+        self._end_run()
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, data):
+        if not self._skip_depth:
+            self._run.append(data)
+
+    def close(self):
+        self._end_run()
+        return self._buf.getvalue()
+
+def html_to_text(html):
+    """
+    Visible text of a UTF-8 encoded HTML document (bytes).
+    """
+    if len(html) < SMALL_HTML_BYTES:
+        text = unescape(TAG_RE.sub("\n", html.decode("utf-8", errors="replace")))
+        # one newline between non-empty text runs, not one per tag
+        return "\n".join(run for run in (ln.strip() for ln in text.split("\n")) if run)
+    if etree is None:
+        soup = BeautifulSoup(html.decode("utf-8", errors="replace"), "html.parser", parse_only=TEXT_STRAINER)
+        return soup.get_text(separator="\n")
+    collector = HTMLTextCollector()
+    parser = etree.HTMLParser(target=collector, encoding="utf-8")
+    try:
+        parser.feed(html)
+        return parser.close()
+    except etree.LxmlError:
+        # keep whatever text was collected before libxml2 gave up
+        return collector.close()
 
 def extract_text_from_payload(payload):
     """
     Walk payload parts to get preferably text/plain; fall back to text/html.
+    Parts are only located during the walk; just the chosen one is base64-decoded.
     """
-    mime = payload.get("mimeType", "")
-    if mime == "text/plain":
-        data = payload.get("body", {}).get("data")
-        if data:
-            text = base64.urlsafe_b64decode(data.encode("ASCII")).decode("utf-8", errors="replace")
-            return text
-    if mime == "text/html":
-        data = payload.get("body", {}).get("data")
+    html_data = None
+    queue = deque([payload])
+    while queue:
+        part = queue.popleft()
+        mime = part.get("mimeType", "")
+        data = (part.get("body") or {}).get("data")
         if data:
-            html = base64.urlsafe_b64decode(data.encode("ASCII")).decode("utf-8", errors="replace")
-            return BeautifulSoup(html, "html.parser").get_text(separator="\n")
-    # If multipart, recurse
-    for part in payload.get("parts", []) or []:
-        text = extract_text_from_payload(part)
-        if text:
-            return text
+            if mime == "text/plain":
+                # urlsafe_b64decode accepts the ASCII str as-is
+                return base64.urlsafe_b64decode(data).decode("utf-8", errors="replace")
+            if mime == "text/html" and html_data is None:
+                html_data = data
+        queue.extend(part.get("parts", []) or [])
+    if html_data:
+        return html_to_text(base64.urlsafe_b64decode(html_data))
     # fallback to snippet
     return None
 
-def header_value(headers, name):
-    for h in headers:
-        if h.get("name", "").lower() == name.lower():
-            return h.get("value")
-    return None
-
-def detect_status(text):
-    if not text:
-        return "Unknown"
-    t = text.lower()
-    for status, patterns in STATUS_PATTERNS.items():
-        for p in patterns:
-            if re.search(p, t):
+def detect_status(*texts):
+    # Several texts are classified as if joined, without building the joined copy.
+    texts = [t for t in texts if t]
+    for status, rx in STATUS_RE.items():
+        for t in texts:
+            if rx.search(t):
                 return status
     return "Unknown"
 
+# Pure functions of one header string; job platforms reuse the same sender and subject templates a lot.
+@functools.lru_cache(maxsize=2048)
 def guess_company_from_from(header_from):
     name, email = parseaddr(header_from or "")
     if name and name.strip():
@@ -120,34 +331,37 @@ def guess_company_from_from(header_from):
     if email and "@" in email:
         domain = email.split("@")[-1].lower()
         # remove common subdomains like mail, jobs
-        domain = re.sub(r'^(mail|no-reply|noreply|jobs|careers)\.', '', domain)
+        domain = SENDER_PREFIX_RE.sub('', domain)
         # remove tld
         name_part = domain.split(".")[0]
         return name_part.capitalize()
     return ""
 
+@functools.lru_cache(maxsize=2048)
 def guess_jobtitle_from_subject(subject):
     if not subject:
         return ""
     # try "Application for X", "Applied to X - Role", "Your application: Software Engineer"
-    m = re.search(r"(application for|applied for|applied to|your application[:\-]\s*)(.+)", subject, flags=re.I)
+    m = TITLE_APPLICATION_RE.search(subject)
     if m:
         # take part to the right, clean
         return m.group(2).strip().strip(" -:")
     # try "Position: Title" or "Role: Title"
-    m2 = re.search(r"(position|role|title)[:\-]\s*(.+)", subject, flags=re.I)
+    m2 = TITLE_FIELD_RE.search(subject)
     if m2:
         return m2.group(2).strip()
     # fallback: return whole subject if short
     return subject.strip() if len(subject or "") < 120 else subject.strip()[:120]
 
-def parse_message(service, msg_id):
-    raw = get_message(service, msg_id)
+def parse_raw(raw, full_body=False):
     payload = raw.get("payload", {})
-    headers = payload.get("headers", [])
-    subject = header_value(headers, "Subject") or raw.get("snippet", "") or ""
-    header_from = header_value(headers, "From") or ""
-    header_date = header_value(headers, "Date")
+    # lowercase-keyed once; on duplicate headers the first occurrence wins, as before
+    hdr = {}
+    for h in payload.get("headers", []):
+        hdr.setdefault(h.get("name", "").lower(), h.get("value"))
+    subject = hdr.get("subject") or raw.get("snippet", "") or ""
+    header_from = hdr.get("from") or ""
+    header_date = hdr.get("date")
     # convert date to ISO if possible
     try:
         date_dt = parsedate_to_datetime(header_date) if header_date else None
@@ -157,9 +371,18 @@ def parse_message(service, msg_id):
         date_iso = date_dt.isoformat() if date_dt else ""
     except Exception:
         date_iso = header_date or ""
-    body = extract_text_from_payload(payload) or raw.get("snippet", "")
-    preview = (body or "")[:1000].replace("\n", " ").strip()
-    status = detect_status((subject or "") + "\n" + (body or ""))
+    snippet = raw.get("snippet", "") or ""
+    # Subject, snippet and body keep the usual status precedence between them. The MIME body is
+    # only decoded/parsed when it could still change the answer (anything short of TOP_STATUS)
+    # or when full_body wants it for the preview.
+    status = detect_status(subject, snippet)
+    body = None
+    if full_body or status != TOP_STATUS:
+        body = extract_text_from_payload(payload)
+        if body and status != TOP_STATUS:
+            status = detect_status(subject, snippet, body)
+    body = body or snippet
+    preview = body[:1000].translate(PREVIEW_TABLE).strip() if body else ""
     company = guess_company_from_from(header_from) or ""
     job_title = guess_jobtitle_from_subject(subject)
     # parse sender email
@@ -177,20 +400,113 @@ def parse_message(service, msg_id):
         "preview": preview,
     }
 
-def write_csv(path, rows, append=False):
-    headers = ["message_id","thread_id","date","sender_name","sender_email","subject","company_guess","job_title_guess","status","preview"]
-    mode = "a" if append else "w"
-    write_header = not (append and os.path.exists(path))
-    with open(path, mode, newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=headers)
-        if write_header:
-            w.writeheader()
-        for r in rows:
-            w.writerow(r)
+def parse_fetched(raws, msg_ids):
+    rows = {}
+    for mid in msg_ids:
+        if mid not in raws:
+            continue
+        try:
+            rows[mid] = parse_raw(raws[mid])
+        except Exception as e:
+            print(f"Error parsing message {mid}: {e}")
+    return rows
+
+def fetch_chunk(service, creds, msg_ids, pool, full_body=False, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Fetch one chunk of messages and submit the full bodies to `pool` for parsing.
+    Unless full_body is set, messages are first fetched as metadata (headers + snippet)
+    and only the ones that can't be classified from that are fetched again in full.
+    Returns (rows, futures), both keyed by msg_id; pass them to collect_chunk().
+    """
+    if full_body:
+        rows = {}
+        full_ids = list(msg_ids)
+    else:
+        rows = parse_fetched(fetch_messages(service, creds, msg_ids, "metadata", concurrency), msg_ids)
+        full_ids = [mid for mid, row in rows.items() if row["status"] == "Unknown"]
+    futures = {}
+    if full_ids:
+        raws = fetch_messages(service, creds, full_ids, "full", concurrency)
+        for mid in full_ids:
+            if mid in raws:
+                futures[mid] = pool.submit(parse_raw, raws[mid], full_body)
+    return rows, futures
+
+def collect_chunk(msg_ids, rows, futures):
+    """
+    Wait for a chunk's parse futures; returns rows in msg_ids order.
+    """
+    out = []
+    for mid in msg_ids:
+        if mid in futures:
+            try:
+                rows[mid] = futures[mid].result()
+            except Exception as e:
+                # keeps the metadata-only row, if there is one
+                print(f"Error parsing message {mid}: {e}")
+        if mid in rows:
+            out.append(rows[mid])
+    return out
+
+class CsvRowWriter(object):
+    """
+    Streams rows to the output CSV. The file is only opened (and, without append,
+    truncated) when the first row arrives, so a run that yields no rows leaves an
+    existing CSV untouched. The header is written unless appending to an existing file.
+    """
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self._f = None
+        self._w = None
+
+    def writerow(self, row):
+        if self._w is None:
+            write_header = not (self.append and os.path.exists(self.path))
+            self._f = open(self.path, "a" if self.append else "w", newline="", encoding="utf-8")
+            self._w = csv.DictWriter(self._f, fieldnames=CSV_HEADERS)
+            if write_header:
+                self._w.writeheader()
+        self._w.writerow(row)
+
+    def flush(self):
+        if self._f is not None:
+            self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+
+@contextlib.contextmanager
+def open_csv(path, append=False):
+    """
+    Yields a CsvRowWriter for streaming rows to `path`.
+    """
+    w = CsvRowWriter(path, append)
+    try:
+        yield w
+    finally:
+        w.close()
 
 def load_existing_ids(path):
     if not os.path.exists(path):
         return set()
+    # message_id is the first column and a short unquoted Gmail id, so only the
+    # text before each line's first comma is needed; no full CSV parse.
+    ids = set()
+    with open(path, "rb") as f:
+        if not f.readline().startswith(b"message_id,"):
+            return load_existing_ids_csv(path)
+        for line in f:
+            mid = line.split(b",", 1)[0].strip()
+            if mid.startswith(b'"'):
+                return load_existing_ids_csv(path)
+            if mid:
+                ids.add(mid.decode("utf-8", errors="replace"))
+    return ids
+
+def load_existing_ids_csv(path):
+    # slow path for files whose first column isn't a plain message_id
     ids = set()
     with open(path, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -207,9 +523,15 @@ def main():
     parser.add_argument("--max", type=int, default=500, help="Max messages to fetch")
     parser.add_argument("--out", type=str, default=DEFAULT_CSV, help="CSV output file")
     parser.add_argument("--append", action="store_true", help="Append to existing CSV and skip existing message_ids")
+    parser.add_argument("--full", action="store_true",
+        help="Fetch and scan every message's full body for status and preview (slower; "
+             "by default only messages the subject/snippet can't classify are fetched in full)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+        help="Max in-flight requests when falling back from batch fetching")
     args = parser.parse_args()
 
-    svc = get_gmail_service()
+    creds = get_credentials()
+    svc = build_gmail_service(creds)
     print("Searching Gmail with query:", args.query)
     ids = search_message_ids(svc, args.query, max_results=args.max)
     print(f"Found {len(ids)} message ids (limited by max={args.max}).")
@@ -217,25 +539,35 @@ def main():
     existing_ids = load_existing_ids(args.out) if args.append else set()
     to_process = [i for i in ids if i not in existing_ids]
     print(f"{len(to_process)} new messages to process (skipping {len(ids)-len(to_process)} already in CSV).")
-    rows = []
-    for i, mid in enumerate(to_process, start=1):
-        try:
-            parsed = parse_message(svc, mid)
-            rows.append(parsed)
-            if i % 25 == 0:
-                print(f"Processed {i}/{len(to_process)}...")
-        except Exception as e:
-            print(f"Error parsing message {mid}: {e}")
+    written = 0
+    if to_process:
+        # Rows are written as each chunk is parsed and flushed per chunk,
+        # so an interrupted run keeps everything fetched so far (and --append can resume it).
+        # Chunk N is parsed on the pool while chunk N+1 is being fetched; rows are written on this thread.
+        chunks = [to_process[i:i + BATCH_SIZE] for i in range(0, len(to_process), BATCH_SIZE)]
+        done = 0
+        pending = None
+        with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as pool, open_csv(args.out, append=args.append) as w:
+            for chunk in chunks + [None]:
+                fetched = None
+                if chunk:
+                    fetched = fetch_chunk(svc, creds, chunk, pool, full_body=args.full, concurrency=args.concurrency)
+                if pending:
+                    for row in collect_chunk(*pending):
+                        w.writerow(row)
+                        written += 1
+                    w.flush()
+                    done += len(pending[0])
+                    print(f"Processed {done}/{len(to_process)}...")
+                pending = (chunk,) + fetched if chunk else None
 
-    if rows:
-        # Overwrite CSV each time
-        write_csv(args.out, rows, append=False)
-        print(f"Wrote {len(rows)} rows to {args.out}.")
+    if written:
+        print(f"Wrote {written} rows to {args.out}.")
 
         # ----------------------
         # Auto-filter and save Excel
         # ----------------------
-        df = pd.DataFrame(rows)
+        df = pd.read_csv(args.out, dtype=str)
 
         # Convert date column to datetime (UTC)
         df['date'] = pd.to_datetime(df['date'], errors='coerce', utc=True)